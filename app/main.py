@@ -1,29 +1,60 @@
-import base64
+import asyncio
+import functools
+import logging
+import os
+import queue
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
 from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
 from typing import Optional
 from fastapi import FastAPI, HTTPException, Request
-from fastapi.responses import JSONResponse
-from pydantic import BaseModel, Field
+from fastapi.exceptions import RequestValidationError
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import JSONResponse, Response
+from jinja2 import Environment
+from pydantic import BaseModel, ConfigDict, Field
 import heroku_applink as sdk
+import orjson
+import pybase64
 from heroku_applink.data_api.record import Record
-from weasyprint import HTML
+from weasyprint import CSS, HTML
+from weasyprint.text.fonts import FontConfiguration
 # Global exception handler to ensure ALL errors return JSON
 from starlette.exceptions import HTTPException as StarletteHTTPException
 
 
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.INFO)
+logger.propagate = False
+LOG_FORMAT = "%(levelname)s %(name)s - %(message)s"
+
+
 # Pydantic Models
 
+# Shared by every model: drop unknown fields, strip surrounding whitespace from
+# strings and make instances immutable once validated
+MODEL_CONFIG = ConfigDict(extra='ignore', frozen=True, str_strip_whitespace=True)
+
+
 class GenerateQuotePdfRequest(BaseModel):
     """Request model for PDF generation"""
+    model_config = MODEL_CONFIG
+
     opportunityId: str = Field(
         ..., 
         description="The Salesforce Opportunity ID (18-character ID)",
+        pattern=r'^006[a-zA-Z0-9]{15}$',
         example="006XXXXXXXXXXXXXXX"
     )
 
 
 class GenerateQuotePdfResponse(BaseModel):
     """Response model for successful PDF generation"""
+    model_config = MODEL_CONFIG
+
     status: str = "success"
     message: str
     contentDocumentId: Optional[str] = None
@@ -32,6 +63,8 @@ class GenerateQuotePdfResponse(BaseModel):
 
 class ErrorResponse(BaseModel):
     """Error response model"""
+    model_config = MODEL_CONFIG
+
     status: str = "error"
     message: str
     errorCode: str
@@ -39,6 +72,8 @@ class ErrorResponse(BaseModel):
 
 class HealthResponse(BaseModel):
     """Health check response"""
+    model_config = MODEL_CONFIG
+
     status: str
     version: str
     timestamp: str
@@ -47,24 +82,125 @@ class HealthResponse(BaseModel):
 
 # FastAPI App Config
 
+class OrjsonResponse(JSONResponse):
+    """JSON response serialized with orjson instead of the stdlib json module"""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content)
+
+
+# WeasyPrint rendering is CPU-bound and holds the GIL, so PDFs are rendered in
+# a pool of worker processes instead of on the event loop. Every uvicorn worker
+# gets its own pool, so the dyno runs WEB_CONCURRENCY x PDF_POOL_WORKERS
+# renderers. os.cpu_count() reports the host's cores rather than the dyno's
+# share, so the pool defaults to one process; raise it on larger dynos.
+PDF_POOL_WORKERS = int(os.environ.get("PDF_POOL_WORKERS", 1))
+PDF_POOL: Optional[ProcessPoolExecutor] = None
+
+
+def create_pdf_pool() -> ProcessPoolExecutor:
+    """Create the PDF worker pool; each worker warms up WeasyPrint as it starts"""
+    return ProcessPoolExecutor(
+        max_workers=PDF_POOL_WORKERS, initializer=init_pdf_worker
+    )
+
+
+def replace_pdf_pool(broken_pool: ProcessPoolExecutor) -> ProcessPoolExecutor:
+    """Swap a broken PDF pool for a new one, unless another render already did"""
+    global PDF_POOL
+    if PDF_POOL is broken_pool:
+        logger.warning("PDF worker pool is broken, starting a new one")
+        broken_pool.shutdown(wait=False)
+        PDF_POOL = create_pdf_pool()
+    return PDF_POOL
+
+
+async def run_in_pdf_pool(func, *args):
+    """
+    Runs func in the PDF worker pool, replacing the pool if it is broken.
+    
+    A worker that dies (OOM kill, Pango/cairo crash) permanently breaks a
+    ProcessPoolExecutor, so without this every later render would fail until
+    the dyno restarted.
+    """
+    pool = PDF_POOL
+    loop = asyncio.get_running_loop()
+    try:
+        future = loop.run_in_executor(pool, func, *args)
+    except BrokenProcessPool:
+        # The pool broke before this job was submitted, so it is safe to retry
+        pool = replace_pdf_pool(pool)
+        future = loop.run_in_executor(pool, func, *args)
+    
+    try:
+        return await future
+    except BrokenProcessPool:
+        # A worker died while this job was queued or running. The job may be
+        # what killed it, so only this request fails; resubmitting could take
+        # down the new pool and every render queued on it.
+        replace_pdf_pool(pool)
+        raise
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create and warm up the PDF worker pool, start logging, and tear both down on exit"""
+    global PDF_POOL
+    # Workers may be forked while other threads (uvicorn's, the log listener)
+    # are running, e.g. when a broken pool is replaced; init_pdf_worker drops
+    # the inherited log handlers, so creation order doesn't matter for logging
+    PDF_POOL = create_pdf_pool()
+    try:
+        # Workers start lazily, so submit one trivial job per worker to start
+        # (and warm) all of them before the first quote request arrives
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(
+            *(loop.run_in_executor(PDF_POOL, os.getpid) for _ in range(PDF_POOL_WORKERS))
+        )
+        
+        # Log records are handed to a queue and written to stderr by a listener
+        # thread, so request handlers never block on stdio
+        log_queue = queue.SimpleQueue()
+        log_handler = logging.StreamHandler()
+        log_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+        log_listener = QueueListener(log_queue, log_handler)
+        queue_handler = QueueHandler(log_queue)
+        logger.addHandler(queue_handler)
+        log_listener.start()
+        try:
+            yield
+        finally:
+            logger.removeHandler(queue_handler)
+            log_listener.stop()
+    finally:
+        PDF_POOL.shutdown()
+        PDF_POOL = None
+
+
+APP_TITLE = "Opportunity Quote PDF Generator API"
+APP_VERSION = "1.0.0"
 
 app = FastAPI(
-    title="Opportunity Quote PDF Generator API",
+    title=APP_TITLE,
     description="A Heroku AppLink microservice that generates PDF quotes from Salesforce Opportunity data.",
-    version="1.0.0",
+    version=APP_VERSION,
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # Add Heroku AppLink middleware for secure Salesforce integration
 app.add_middleware(sdk.IntegrationAsgiMiddleware)
 
+# Compress larger responses for clients that accept gzip
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 
 
 @app.exception_handler(StarletteHTTPException)
 async def http_exception_handler(request: Request, exc: StarletteHTTPException):
     """Handle HTTP exceptions and return JSON"""
-    return JSONResponse(
+    return OrjsonResponse(
         status_code=exc.status_code,
         content={
             "status": "error",
@@ -73,15 +209,29 @@ async def http_exception_handler(request: Request, exc: StarletteHTTPException):
         }
     )
 
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request, exc: RequestValidationError):
+    """Return request validation errors (e.g. a malformed opportunityId) as JSON"""
+    message = "; ".join(
+        f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+        for error in exc.errors()
+    )
+    return OrjsonResponse(
+        status_code=422,
+        content={
+            "status": "error",
+            "message": message,
+            "errorCode": "VALIDATION_ERROR"
+        }
+    )
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
     """Catch ALL exceptions (including middleware errors) and return JSON"""
-    import traceback
-
-    print("Exception caught by global handler 234235465365===>>>>>")
-    print(f"Exception caught by global handler: {type(exc).__name__}: {str(exc)}")
-    print(f"Traceback: {traceback.format_exc()}")
-    return JSONResponse(
+    logger.error(
+        "Exception caught by global handler: %s: %s", type(exc).__name__, exc, exc_info=exc
+    )
+    return OrjsonResponse(
         status_code=500,
         content={
             "status": "error",
@@ -94,13 +244,122 @@ async def global_exception_handler(request: Request, exc: Exception):
 
 # PDF Generation Logic
 
-def create_pdf_from_opportunity_data(opportunity_data: dict, quote_lines: list) -> bytes:
+def format_currency(value) -> str:
+    """Format a number as a dollar amount, e.g. 1234.5 -> $1,234.50"""
+    return f"${value:,.2f}"
+
+
+# Shared across renders in each worker process so fonts are discovered once
+# and fetched resources are cached instead of being set up for every quote.
+FONT_CONFIG = FontConfiguration()
+WEASYPRINT_RESOURCE_CACHE = {}
+
+# The quote stylesheet never changes, so it is parsed once per worker and
+# handed to WeasyPrint rather than embedded in every document. The template
+# refers to it through classes only; inline style attributes would be parsed
+# again for every row of every quote.
+QUOTE_CSS = """
+    * { margin: 0; padding: 0; box-sizing: border-box; }
+    body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; padding: 40px; color: #333; }
+    .header { margin-bottom: 30px; }
+    .header h1 { color: #1798c1; margin-bottom: 10px; }
+    .meta-info { margin-bottom: 20px; }
+    .meta-info p { margin: 5px 0; }
+    table { width: 100%; border-collapse: collapse; margin: 20px 0; table-layout: fixed; }
+    th, td { border: 1px solid #ddd; padding: 12px; text-align: left; }
+    th { background-color: #1798c1; color: white; font-weight: 600; }
+    .col-description { width: 55%; }
+    .col-number { width: 15%; }
+    .center { text-align: center; }
+    .right { text-align: right; }
+    .empty { text-align: center; color: #666; }
+    tbody tr:nth-child(even) { background-color: #f9f9f9; }
+    .total-row { font-weight: bold; background-color: #e9ecef !important; }
+    .footer { margin-top: 40px; padding-top: 20px; border-top: 1px solid #ddd; }
+    @page { size: A4; margin: 2cm; }
+"""
+STYLE_CSS = CSS(string=QUOTE_CSS, font_config=FONT_CONFIG)
+
+# Compiled once at import and reused for every quote; autoescaping keeps
+# Salesforce field values from injecting markup into the PDF.
+TEMPLATE_ENV = Environment(autoescape=True)
+TEMPLATE_ENV.filters["currency"] = format_currency
+
+QUOTE_TEMPLATE = TEMPLATE_ENV.from_string("""
+    <!DOCTYPE html>
+    <html>
+    <head>
+        <meta charset="UTF-8">
+        <title>Quote for {{ opp_name }}</title>
+    </head>
+    <body>
+        <div class="header">
+            <h1>Quote for {{ opp_name }}</h1>
+            <p><strong>Quote Date:</strong> {{ current_date }}</p>
+        </div>
+        
+        <div class="meta-info">
+            <p><strong>Opportunity ID:</strong> {{ opp_id }}</p>
+            <p><strong>Account:</strong> {{ account_name }}</p>
+            <p><strong>Stage:</strong> {{ stage }}</p>
+            <p><strong>Expected Close Date:</strong> {{ close_date }}</p>
+            <p><strong>Opportunity Amount:</strong> {{ amount|currency }}</p>
+        </div>
+        
+        <h2>Quote Line Items</h2>
+        <table>
+            <colgroup>
+                <col class="col-description">
+                <col class="col-number">
+                <col class="col-number">
+                <col class="col-number">
+            </colgroup>
+            <thead>
+                <tr>
+                    <th>Description</th>
+                    <th class="center">Quantity</th>
+                    <th class="right">Unit Price</th>
+                    <th class="right">Total</th>
+                </tr>
+            </thead>
+            <tbody>
+                {% for line in lines %}
+                <tr>
+                    <td>{{ line.description }}</td>
+                    <td class="center">{{ line.quantity }}</td>
+                    <td class="right">{{ line.unit_price|currency }}</td>
+                    <td class="right">{{ line.total_price|currency }}</td>
+                </tr>
+                {% endfor %}
+                {% if lines %}
+                <tr class="total-row">
+                    <td colspan="3" class="right"><strong>Total:</strong></td>
+                    <td class="right"><strong>{{ total_amount|currency }}</strong></td>
+                </tr>
+                {% else %}
+                <tr><td colspan="4" class="empty">No line items found</td></tr>
+                {% endif %}
+            </tbody>
+        </table>
+        
+        <div class="footer">
+            <p>Generated on {{ current_date }}</p>
+        </div>
+    </body>
+    </html>
+""")
+
+
+def create_pdf_from_opportunity_data(
+    opportunity_data: dict, quote_lines: list, current_date: str
+) -> bytes:
     """
     Generates a PDF byte string from Opportunity and Quote Line data.
     
     Args:
         opportunity_data: Dictionary containing Opportunity fields
         quote_lines: List of Quote Line Item records
+        current_date: Quote date as shown on the document
     
     Returns:
         PDF as bytes
@@ -110,7 +369,7 @@ def create_pdf_from_opportunity_data(opportunity_data: dict, quote_lines: list)
     opp_name = opportunity_data.get('Name', 'N/A')
     opp_id = opportunity_data.get('Id', 'N/A')
 
-    print('opportunity_data===>>>>>', opportunity_data)
+    logger.debug("Rendering quote PDF for opportunity data: %s", opportunity_data)
     account_name = 'N/A'
     if 'Account' in opportunity_data:
         account = opportunity_data.get('Account')
@@ -121,112 +380,179 @@ def create_pdf_from_opportunity_data(opportunity_data: dict, quote_lines: list)
     close_date = opportunity_data.get('CloseDate', 'N/A')
     stage = opportunity_data.get('StageName', 'N/A')
     
-    # Build quote line items table rows
-    line_items_html = ""
-    total_amount = 0
+    # Collect quote line items for the table rows
+    lines = [
+        {
+            "description": line.get('Description', 'N/A'),
+            "quantity": line.get('Quantity', 0) or 0,
+            "unit_price": line.get('UnitPrice', 0) or 0,
+            "total_price": line.get('TotalPrice', 0) or 0
+        }
+        for line in quote_lines
+    ]
+    total_amount = sum(line["total_price"] for line in lines)
     
-    for line in quote_lines:
-        description = line.get('Description', 'N/A')
-        quantity = line.get('Quantity', 0) or 0
-        unit_price = line.get('UnitPrice', 0) or 0
-        total_price = line.get('TotalPrice', 0) or 0
-        total_amount += total_price
-        
-        line_items_html += f"""
-            <tr>
-                <td>{description}</td>
-                <td style="text-align: center;">{quantity}</td>
-                <td style="text-align: right;">${unit_price:,.2f}</td>
-                <td style="text-align: right;">${total_price:,.2f}</td>
-            </tr>
-        """
+    # Build HTML content
+    html_content = QUOTE_TEMPLATE.render(
+        opp_name=opp_name,
+        opp_id=opp_id,
+        account_name=account_name,
+        amount=amount,
+        close_date=close_date,
+        stage=stage,
+        lines=lines,
+        total_amount=total_amount,
+        current_date=current_date
+    )
     
-    # Add total row
-    line_items_html += f"""
-        <tr class="total-row">
-            <td colspan="3" style="text-align: right;"><strong>Total:</strong></td>
-            <td style="text-align: right;"><strong>${total_amount:,.2f}</strong></td>
-        </tr>
+    # Convert HTML to PDF
+    pdf_bytes = HTML(string=html_content).write_pdf(
+        stylesheets=[STYLE_CSS],
+        font_config=FONT_CONFIG,
+        cache=WEASYPRINT_RESOURCE_CACHE
+    )
+    return pdf_bytes
+
+
+def init_pdf_worker() -> None:
     """
+    Sets up logging and warms up WeasyPrint when a PDF worker process starts.
     
-    current_date = datetime.now().strftime("%B %d, %Y")
+    A worker forked after startup (e.g. when a broken pool is replaced) inherits
+    the parent's QueueHandler, whose queue nothing reads in this process, so
+    the worker logs straight to stderr instead. The first WeasyPrint render
+    loads Pango/cairo and scans system fonts, which would otherwise slow down
+    the first quote handled by each worker.
+    """
+    for handler in list(logger.handlers):
+        logger.removeHandler(handler)
+    log_handler = logging.StreamHandler()
+    log_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    logger.addHandler(log_handler)
     
-    # Build HTML content
-    html_content = f"""
-    <!DOCTYPE html>
-    <html>
-    <head>
-        <meta charset="UTF-8">
-        <title>Quote for {opp_name}</title>
-        <style>
-            * {{ margin: 0; padding: 0; box-sizing: border-box; }}
-            body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; padding: 40px; color: #333; }}
-            .header {{ margin-bottom: 30px; }}
-            .header h1 {{ color: #1798c1; margin-bottom: 10px; }}
-            .meta-info {{ margin-bottom: 20px; }}
-            .meta-info p {{ margin: 5px 0; }}
-            table {{ width: 100%; border-collapse: collapse; margin: 20px 0; }}
-            th, td {{ border: 1px solid #ddd; padding: 12px; text-align: left; }}
-            th {{ background-color: #1798c1; color: white; font-weight: 600; }}
-            tbody tr:nth-child(even) {{ background-color: #f9f9f9; }}
-            .total-row {{ font-weight: bold; background-color: #e9ecef !important; }}
-            .footer {{ margin-top: 40px; padding-top: 20px; border-top: 1px solid #ddd; }}
-            @page {{ size: A4; margin: 2cm; }}
-        </style>
-    </head>
-    <body>
-        <div class="header">
-            <h1>Quote for {opp_name}</h1>
-            <p><strong>Quote Date:</strong> {current_date}</p>
-        </div>
-        
-        <div class="meta-info">
-            <p><strong>Opportunity ID:</strong> {opp_id}</p>
-            <p><strong>Account:</strong> {account_name}</p>
-            <p><strong>Stage:</strong> {stage}</p>
-            <p><strong>Expected Close Date:</strong> {close_date}</p>
-            <p><strong>Opportunity Amount:</strong> ${amount:,.2f}</p>
-        </div>
-        
-        <h2>Quote Line Items</h2>
-        <table>
-            <thead>
-                <tr>
-                    <th>Description</th>
-                    <th style="text-align: center;">Quantity</th>
-                    <th style="text-align: right;">Unit Price</th>
-                    <th style="text-align: right;">Total</th>
-                </tr>
-            </thead>
-            <tbody>
-                {line_items_html if quote_lines else '<tr><td colspan="4" style="text-align: center; color: #666;">No line items found</td></tr>'}
-            </tbody>
-        </table>
-        
-        <div class="footer">
-            <p>Generated on {current_date}</p>
-        </div>
-    </body>
-    </html>
+    HTML(string="<p>warmup</p>").write_pdf(
+        stylesheets=[STYLE_CSS],
+        font_config=FONT_CONFIG,
+        cache=WEASYPRINT_RESOURCE_CACHE
+    )
+
+
+# Recently rendered PDFs, keyed on everything that goes into the document so
+# re-quoting an unchanged Opportunity (double clicks, retries) skips WeasyPrint.
+# Entries are the render futures themselves, which also lets concurrent
+# duplicate requests share a single render. Every uvicorn worker keeps its own
+# cache, so it is bounded by entry count and by the total size of the PDFs it
+# holds; a PDF larger than the whole budget is never kept.
+PDF_RESULT_CACHE_SIZE = int(os.environ.get("PDF_RESULT_CACHE_SIZE", 64))
+PDF_RESULT_CACHE_BYTES = int(os.environ.get("PDF_RESULT_CACHE_BYTES", 16 * 1024 * 1024))
+PDF_RESULTS: "OrderedDict[bytes, asyncio.Future]" = OrderedDict()
+# Size in bytes of each finished render in PDF_RESULTS
+PDF_RESULT_SIZES: dict = {}
+
+
+def _record_fields(value):
+    """orjson fallback that serializes nested records (e.g. Account) as their fields"""
+    if isinstance(value, Record):
+        return value.fields
+    raise TypeError
+
+
+def _drop_pdf_result(key: bytes) -> None:
+    """Remove an entry from PDF_RESULTS along with its recorded size"""
+    PDF_RESULTS.pop(key, None)
+    PDF_RESULT_SIZES.pop(key, None)
+
+
+def _on_render_done(key: bytes, pdf_future: asyncio.Future) -> None:
+    """
+    Drops failed or cancelled renders so they can be retried, and keeps
+    finished ones within PDF_RESULT_CACHE_BYTES by evicting the oldest.
     """
+    failed = pdf_future.cancelled() or pdf_future.exception() is not None
+    if PDF_RESULTS.get(key) is not pdf_future:
+        return
     
-    # Convert HTML to PDF
-    pdf_bytes = HTML(string=html_content).write_pdf()
-    return pdf_bytes
+    size = 0 if failed else len(pdf_future.result())
+    if failed or size > PDF_RESULT_CACHE_BYTES:
+        _drop_pdf_result(key)
+        return
+    
+    PDF_RESULT_SIZES[key] = size
+    while sum(PDF_RESULT_SIZES.values()) > PDF_RESULT_CACHE_BYTES:
+        _drop_pdf_result(next(k for k in PDF_RESULTS if k in PDF_RESULT_SIZES))
+
+
+async def render_quote_pdf(
+    opportunity_data: dict, quote_lines: list, current_date: str
+) -> bytes:
+    """
+    Renders a quote PDF in the worker pool, reusing a recent identical render.
+    
+    Args:
+        opportunity_data: Dictionary containing Opportunity fields
+        quote_lines: List of Quote Line Item records
+        current_date: Quote date as shown on the document
+    
+    Returns:
+        PDF as bytes
+    """
+    key = orjson.dumps(
+        [opportunity_data, quote_lines, current_date],
+        default=_record_fields,
+        option=orjson.OPT_SORT_KEYS
+    )
+    
+    pdf_future = PDF_RESULTS.get(key)
+    if pdf_future is None:
+        pdf_future = asyncio.ensure_future(run_in_pdf_pool(
+            create_pdf_from_opportunity_data,
+            opportunity_data,
+            quote_lines,
+            current_date
+        ))
+        PDF_RESULTS[key] = pdf_future
+        # Runs even if every waiting request has gone away
+        pdf_future.add_done_callback(functools.partial(_on_render_done, key))
+        if len(PDF_RESULTS) > PDF_RESULT_CACHE_SIZE:
+            _drop_pdf_result(next(iter(PDF_RESULTS)))
+    else:
+        PDF_RESULTS.move_to_end(key)
+    
+    # Shielded so a cancelled request doesn't cancel a render others share
+    return await asyncio.shield(pdf_future)
+
+
+def soql_quote(value: str) -> str:
+    """Quote a value as a SOQL string literal, escaping backslashes and quotes"""
+    escaped = value.replace('\\', '\\\\').replace("'", "\\'")
+    return f"'{escaped}'"
+
+
+# PDFs up to this size are base64-encoded inline; the executor round-trip
+# costs more than the encode itself for anything smaller
+VERSION_DATA_INLINE_LIMIT = 1024 * 1024
+
+
+def encode_version_data(pdf_bytes: bytes) -> str:
+    """Base64-encode PDF bytes for a ContentVersion VersionData field"""
+    return pybase64.b64encode(pdf_bytes).decode('ascii')
 
 
 
 # API Endpoints
 
 
+HEALTH_STATUS = {"status": "healthy", "version": APP_VERSION}
+
+
 @app.get("/health", response_model=HealthResponse, tags=["System"])
 async def health_check():
     """Health check endpoint to verify service status."""
-    return HealthResponse(
-        status="healthy",
-        version="1.0.0",
-        timestamp=datetime.now(timezone.utc).isoformat()
-    )
+    # Only the timestamp changes, so skip building and validating a model
+    return OrjsonResponse({
+        **HEALTH_STATUS,
+        "timestamp": datetime.now(timezone.utc).isoformat()
+    })
 
 
 @app.post(
@@ -234,6 +560,7 @@ async def health_check():
     response_model=GenerateQuotePdfResponse,
     responses={
         404: {"model": ErrorResponse},
+        422: {"model": ErrorResponse},
         500: {"model": ErrorResponse}
     },
     tags=["Quote Generation"]
@@ -255,64 +582,79 @@ async def generate_quote_pdf(request: GenerateQuotePdfRequest):
         
         opportunity_id = request.opportunityId
         
-        # Query Salesforce for Opportunity data
+        # Query Salesforce for Opportunity and Quote Line Item data concurrently
         opp_query = f"""
             SELECT Id, Name, Amount, StageName, CloseDate, Account.Name
             FROM Opportunity 
-            WHERE Id = '{opportunity_id}' 
+            WHERE Id = {soql_quote(opportunity_id)} 
             LIMIT 1
         """
+        quote_lines_query = f"""
+            SELECT Id, Description, Quantity, UnitPrice, TotalPrice
+            FROM QuoteLineItem 
+            WHERE Quote.OpportunityId = {soql_quote(opportunity_id)}
+        """
         
-        opp_result = await data_api.query(opp_query)
+        opp_result, quote_lines_result = await asyncio.gather(
+            data_api.query(opp_query),
+            data_api.query(quote_lines_query)
+        )
         
         if not opp_result.records:
-            return JSONResponse(
+            return OrjsonResponse(
                 status_code=404,
                 content={"status": "error", "message": "Opportunity not found", "errorCode": "NOT_FOUND"}
             )
         
         opp_record = opp_result.records[0].fields
-        
-        # Query for Quote Line Items
-        quote_lines_query = f"""
-            SELECT Id, Description, Quantity, UnitPrice, TotalPrice
-            FROM QuoteLineItem 
-            WHERE Quote.OpportunityId = '{opportunity_id}'
-        """
-        
-        quote_lines_result = await data_api.query(quote_lines_query)
         quote_lines = [record.fields for record in quote_lines_result.records] if quote_lines_result.records else []
         
-        # Generate PDF
-        pdf_bytes = create_pdf_from_opportunity_data(opp_record, quote_lines)
+        # Read the clock once for both the quote date and the file name
+        now = datetime.now(timezone.utc)
+        current_date = now.strftime("%B %d, %Y")
+        timestamp = now.strftime("%Y%m%d_%H%M%S")
+        
+        # Generate PDF in the worker pool so the event loop stays responsive
+        pdf_bytes = await render_quote_pdf(opp_record, quote_lines, current_date)
         
         # Upload PDF to Salesforce
         opp_name = opp_record.get('Name', 'Quote')
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        
+        # DataAPI.create only sends JSON bodies, so VersionData must be base64.
+        # pybase64 releases the GIL, so large PDFs are encoded in a thread
+        # without stalling the event loop; typical quotes are cheaper inline.
+        if len(pdf_bytes) > VERSION_DATA_INLINE_LIMIT:
+            version_data = await asyncio.get_running_loop().run_in_executor(
+                None, encode_version_data, pdf_bytes
+            )
+        else:
+            version_data = encode_version_data(pdf_bytes)
         
         file_data = {
             "Title": f"Quote - {opp_name}",
             "PathOnClient": f"Quote_{opportunity_id}_{timestamp}.pdf",
-            "VersionData": base64.b64encode(pdf_bytes).decode('utf-8'),
+            "VersionData": version_data,
             #"OwnerId": client_context.user.id,
             "Description": f"Auto-generated quote PDF for Opportunity: {opp_name}"
         }
         
-        print('Creating Content Version===>>>>>')
+        logger.info("Creating ContentVersion for opportunity %s", opportunity_id)
         # Create ContentVersion
         cv_record = Record(type="ContentVersion", fields=file_data)
         content_version_id = await data_api.create(cv_record)
 
-        print(f"Content Version Response===>>>>> {content_version_id}")
+        logger.info("Created ContentVersion %s", content_version_id)
 
         #content_version_id = cv_response.id
         
         # Get ContentDocumentId
-        cd_query = f"SELECT ContentDocumentId FROM ContentVersion WHERE Id = '{content_version_id}'"
+        cd_query = f"SELECT ContentDocumentId FROM ContentVersion WHERE Id = {soql_quote(content_version_id)}"
         cd_result = await data_api.query(cd_query)
         content_document_id = cd_result.records[0].fields['ContentDocumentId']
         
-        # Link PDF to Opportunity using Record object
+        # Link PDF to Opportunity explicitly rather than via FirstPublishLocationId,
+        # whose org-dependent defaults (inferred ShareType, InternalUsers
+        # visibility) could change who can see or edit the file
         cdl_record = Record(
             type="ContentDocumentLink",
             fields={
@@ -323,7 +665,7 @@ async def generate_quote_pdf(request: GenerateQuotePdfRequest):
             }
         )
         await data_api.create(cdl_record)
-        print("ContentDocumentLink created!")
+        logger.info("Linked ContentDocument %s to opportunity %s", content_document_id, opportunity_id)
 
         return GenerateQuotePdfResponse(
             status="success",
@@ -333,24 +675,28 @@ async def generate_quote_pdf(request: GenerateQuotePdfRequest):
         )
         
     except HTTPException as e:
-        return JSONResponse(
+        return OrjsonResponse(
             status_code=e.status_code,
             content=e.detail if isinstance(e.detail, dict) else {"status": "error", "message": str(e.detail), "errorCode": "HTTP_ERROR"}
         )
     except Exception as e:
-        print(f"Error generating PDF: {e}")
-        return JSONResponse(
+        logger.exception("Error generating PDF")
+        return OrjsonResponse(
             status_code=500,
             content={"status": "error", "message": f"Internal Server Error: {str(e)}", "errorCode": "INTERNAL_ERROR"}
         )
 
 
+# The API information never changes, so it is serialized once at import
+ROOT_RESPONSE_BODY = orjson.dumps({
+    "name": APP_TITLE,
+    "version": APP_VERSION,
+    "docs": "/docs",
+    "health": "/health"
+})
+
+
 @app.get("/", tags=["System"])
 async def root():
     """Root endpoint with API information"""
-    return {
-        "name": "Opportunity Quote PDF Generator API",
-        "version": "1.0.0",
-        "docs": "/docs",
-        "health": "/health"
-    }
+    return Response(content=ROOT_RESPONSE_BODY, media_type="application/json")